@@ -1,6 +1,9 @@
 from flask import Flask
 from flask_influxdb import InfluxDB
 import settings
+import signal
+import sys
+import threading
 
 influx_db = InfluxDB()
 
@@ -9,15 +12,22 @@ def create_app(testing=False):
 
     app = Flask(__name__)
     # app.config.from_object("config.DevelopmentConfig")
+    app.config['TESTING'] = testing
     with app.app_context():
 
-        from app import views
-
         influx_db.init_app(app=app)
-        from app import database
-        db = database.Database()
-        from app import humidity
-        sensor = humidity.Sensor(db)
-        sensor.get_data()
+
+        # The sensor loop blocks and needs the DHT22 and InfluxDB, skip it in tests
+        if not testing:
+            from app import database
+            db = database.Database()
+            from app import humidity
+            sensor = humidity.Sensor(db)
+            # stop() takes the Event's lock, which the interrupted main thread may be holding
+            # inside wait(), so set it from another thread instead of the signal handler
+            signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=sensor.stop).start())
+            sensor.get_data()
+            # get_data only returns once stopped, so the process is shutting down
+            sys.exit(0)
 
     return app
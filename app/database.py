@@ -1,34 +1,132 @@
 from influxdb import InfluxDBClient
+from influxdb.exceptions import InfluxDBClientError
+from influxdb.line_protocol import quote_ident
+import collections
+import logging
 import os
+import threading
 
-my_client = InfluxDBClient(os.getenv('HOST'),
-                           os.getenv('PORT'),
-                           os.getenv('USERNAME'),
-                           os.getenv('PASSWORD'),
-                           os.getenv('DB_NAME'))
+HOST = os.getenv('HOST')
+PORT = os.getenv('PORT')
+USERNAME = os.getenv('USERNAME')
+PASSWORD = os.getenv('PASSWORD')
+DB_NAME = os.getenv('DB_NAME')
+UDP_PORT = os.getenv('UDP_PORT')
+# Seconds per InfluxDB request attempt, and attempts before a request is given up
+REQUEST_TIMEOUT = 5
+REQUEST_RETRIES = 3
+# How long shutdown waits for an in-flight write, enough for one request to use all its attempts
+SHUTDOWN_TIMEOUT = REQUEST_TIMEOUT * REQUEST_RETRIES + 1
+
+_missing = [name for name, value in (('HOST', HOST), ('PORT', PORT), ('DB_NAME', DB_NAME)) if not value]
+if _missing:
+    raise RuntimeError("Missing database settings: {0}".format(", ".join(_missing)))
+
+# Setting UDP_PORT sends points fire-and-forget over UDP instead of an HTTP POST per batch.
+# Over UDP the target database, retention policy and precision come from the server's [[udp]]
+# section, not DB_NAME, and it must use "s" like the points we write. Lost datagrams raise
+# nothing, so buffered points are never retried the way failed HTTP writes are.
+my_client = InfluxDBClient(HOST,
+                           PORT,
+                           USERNAME,
+                           PASSWORD,
+                           DB_NAME,
+                           use_udp=bool(UDP_PORT),
+                           udp_port=int(UDP_PORT or 4444),
+                           timeout=REQUEST_TIMEOUT,
+                           retries=REQUEST_RETRIES)
+
+logger = logging.getLogger(__name__)
 
 
 class Database(object):
 
-    def __init__(self):
-        print('Get database client')
+    def __init__(self, batch_size=50, flush_interval=60.0, max_buffered=4096):
+        logger.debug('Get database client')
+        # Points are buffered and sent in one request once either limit is hit
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # While InfluxDB is unreachable only the newest max_buffered points are kept
+        self._buffer = collections.deque(maxlen=max_buffered)
+        self._lock = threading.Lock()
+        self._write_failed = False
+        # Points taken off the buffer by a write that hasn't finished yet
+        self._in_flight = 0
+        self.dropped = 0
+        self.client = my_client
         try:
-            self.client = my_client
-            self.client.create_database(os.getenv('DB_NAME'))
-            self.client.create_retention_policy('awesome_policy', '14d', '3', default=True)
+            self._create_database()
         except Exception as ex:
-            print("Error creating client: {0}".format(ex))
+            logger.exception("Error creating client: %s", ex)
+        # Writes to InfluxDB happen on this thread so a slow request never delays a sensor read
+        self._flush_needed = threading.Event()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._run_flusher, name='influxdb-flusher', daemon=True)
+        self._flusher.start()
+
+    def _create_database(self):
+        # One statement creates the database with its default retention policy and is a
+        # no-op when both already exist, instead of two round trips on every start
+        try:
+            self.client.query('CREATE DATABASE {0} WITH DURATION 14d REPLICATION 3 NAME "awesome_policy"'
+                              .format(quote_ident(DB_NAME)), method='POST')
+        except InfluxDBClientError:
+            # The database exists without awesome_policy as its default, e.g. created elsewhere
+            self.client.query('CREATE RETENTION POLICY "awesome_policy" ON {0} DURATION 14d REPLICATION 3 DEFAULT'
+                              .format(quote_ident(DB_NAME)), method='POST')
 
     def write(self, json_body):
+        with self._lock:
+            self.dropped += max(0, len(self._buffer) + len(json_body) - self._buffer.maxlen)
+            self._buffer.extend(json_body)
+            # After a failed write only retry on the flush interval, not on every new point
+            due = len(self._buffer) >= self.batch_size and not self._write_failed
+        if due:
+            self._flush_needed.set()
+
+    def _run_flusher(self):
+        while not self._closed.is_set():
+            self._flush_needed.wait(self.flush_interval)
+            self._flush_needed.clear()
+            self.flush()
+
+    def close(self):
+        self._closed.set()
+        self._flush_needed.set()
+        self._flusher.join(timeout=SHUTDOWN_TIMEOUT)
+        if not self._flusher.is_alive():
+            self.flush()
+        with self._lock:
+            abandoned = len(self._buffer) + self._in_flight
+        if abandoned:
+            logger.warning("Shutting down with %d points not written to InfluxDB", abandoned)
+
+    def flush(self):
+        with self._lock:
+            batch = list(self._buffer)
+            self._buffer.clear()
+            self._in_flight = len(batch)
+        if not batch:
+            return
         try:
-            self.client.write_points(json_body, 's')
+            self.client.write_points(batch, 's', batch_size=self.batch_size)
+            with self._lock:
+                self._in_flight = 0
+                self._write_failed = False
         except Exception as ex:
-            print("Error writing data: {0}".format(ex))
+            with self._lock:
+                self._in_flight = 0
+                # Put the batch back ahead of anything written meanwhile, dropping the oldest on overflow
+                pending = batch + list(self._buffer)
+                self.dropped += max(0, len(pending) - self._buffer.maxlen)
+                self._buffer = collections.deque(pending, maxlen=self._buffer.maxlen)
+                self._write_failed = True
+            logger.exception("Error writing data (%d points buffered, %d dropped): %s",
+                             len(self._buffer), self.dropped, ex)
 
     def query(self, query):
-        print("Query: {0}".format(query))
+        logger.debug("Query: %s", query)
         try:
             self.client.query(query)
         except Exception as ex:
-            print("Error querying data: {0}".format(ex))
-
+            logger.exception("Error querying data: %s", ex)
@@ -1,41 +1,92 @@
 import adafruit_dht as DHT
 import board
+import logging
+import threading
 import time
 
+logger = logging.getLogger(__name__)
+
 
 DHT_PIN = board.D4
 DHT_SENSOR = DHT.DHT22(DHT_PIN, False)
+# adafruit_dht only re-reads the sensor once more than this has passed since the last read
+DHT_MIN_PERIOD = 2.0
+# Keep reads clear of that limit so wake-up jitter doesn't hand us cached values
+MIN_READ_PERIOD = DHT_MIN_PERIOD + 0.5
+# Longest wait between retries while reads keep failing
+MAX_BACKOFF = 30.0
+
+# Tags never change, so share one dict per measurement instead of building them every read
+TEMPERATURE_TAGS = {"sensor": "DHT22", "data": "celsius"}
+HUMIDITY_TAGS = {"sensor": "DHT22", "data": "percentage"}
+
+
+def _next_delay(delay, failures, interval):
+    # A single failure retries on the normal cadence, repeated ones back off exponentially
+    if failures > 1:
+        return min(delay * 2, max(MAX_BACKOFF, interval))
+    return interval
+
+
+def _next_deadline(next_tick, delay, last_read, now):
+    # Never earlier than MIN_READ_PERIOD after the last read started, so adafruit_dht always
+    # takes a fresh frame, and after an overrun start right away without catching up missed ones
+    return max(next_tick + delay, last_read + MIN_READ_PERIOD, now)
 
 
 class Sensor(object):
 
     def __init__(self, db):
         self.db = db
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def _write(self, humidity, temperature):
+        # Writes are batched, so stamp the points here rather than on arrival
+        timestamp = int(time.time())
+        logger.info("Temp=%0.1f*C   Humidity=%0.1f%%", temperature, humidity)
+        self.db.write([{
+            "measurement": "temperature",
+            "tags": TEMPERATURE_TAGS,
+            "time": timestamp,
+            "fields": {
+                "value": temperature,
+            }
+        },
+            {
+                "measurement": "humidity",
+                "tags": HUMIDITY_TAGS,
+                "time": timestamp,
+                "fields": {
+                    "value": humidity,
+                }
+            }
+        ])
 
-    def get_data(self):
-        while True:
-            try:
-                humidity = DHT_SENSOR.humidity
-                temperature = DHT_SENSOR.temperature
-                print("Temp={0:0.1f}*C   Humidity={1:0.1f}%".format(temperature, humidity))
-                self.db.write([{
-                    "measurement": "temperature",
-                    "tags": {"sensor": "DHT22", "data": "celsius"},
-                    "fields": {
-                        "value": temperature,
-                    }
-                },
-                    {
-                        "measurement": "humidity",
-                        "tags": {"sensor": "DHT22", "data": "percentage"},
-                        "fields": {
-                            "value": humidity,
-                     }
-                    }
-                ])
-                time.sleep(2.0)
-            except RuntimeError as error:
-                # Errors happen fairly often, DHT's are hard to read, just keep going
-                print(error.args[0])
-                time.sleep(2.0)
-                continue
+    def get_data(self, interval=MIN_READ_PERIOD):
+        # Schedule against a monotonic deadline so read and write time don't stretch the interval
+        interval = max(interval, MIN_READ_PERIOD)
+        next_tick = time.monotonic()
+        delay = interval
+        dht = DHT_SENSOR
+        failures = 0
+        try:
+            while not self._stop.is_set():
+                last_read = time.monotonic()
+                try:
+                    humidity = dht.humidity
+                    temperature = dht.temperature
+                    self._write(humidity, temperature)
+                    failures = 0
+                except RuntimeError as error:
+                    # Errors happen fairly often, DHT's are hard to read, just keep going
+                    failures += 1
+                    logger.warning("%s", error.args[0])
+                delay = _next_delay(delay, failures, interval)
+                next_tick = _next_deadline(next_tick, delay, last_read, time.monotonic())
+                self._stop.wait(max(0, next_tick - time.monotonic()))
+        finally:
+            # Don't lose buffered points when the loop is interrupted
+            self.db.close()
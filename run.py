@@ -1,5 +1,20 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
 from app import create_app
 
+# Log records are written to stdout by a listener thread so the sensor loop never blocks on it.
+# Plain messages keep the output the same as the print() calls they replaced.
+log_queue = queue.Queue()
+logging.basicConfig(level=logging.INFO, format='%(message)s',
+                    handlers=[logging.handlers.QueueHandler(log_queue)])
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+log_listener.start()
+atexit.register(log_listener.stop)
+
 app = create_app()
 app.app_context().push()
 
@@ -1,3 +1,6 @@
+import os
+
 from dotenv import load_dotenv
 
-load_dotenv()
+# Load the .env next to this file instead of searching upwards from the working directory
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env'), override=False)
@@ -0,0 +1,12 @@
+import os
+import sys
+import types
+
+# The DHT22 driver and board pins only exist on a Raspberry Pi, tests never read the sensor
+sys.modules.setdefault('board', types.SimpleNamespace(D4=4))
+sys.modules.setdefault('adafruit_dht', types.SimpleNamespace(DHT22=lambda pin, use_pulseio: object()))
+
+# app.database refuses to import without these; tests swap in a fake client before connecting
+os.environ.setdefault('HOST', 'localhost')
+os.environ.setdefault('PORT', '8086')
+os.environ.setdefault('DB_NAME', 'thermostat_test')
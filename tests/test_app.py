@@ -0,0 +1,16 @@
+import sys
+
+from app import create_app
+
+
+def test_create_app_testing_skips_sensor(monkeypatch):
+    # Other tests import these modules directly
+    monkeypatch.delitem(sys.modules, 'app.humidity', raising=False)
+    monkeypatch.delitem(sys.modules, 'app.database', raising=False)
+
+    app = create_app(testing=True)
+
+    assert app.testing
+    # Neither the DHT22 loop nor the InfluxDB client are set up in tests
+    assert 'app.humidity' not in sys.modules
+    assert 'app.database' not in sys.modules
@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+
+from app import database
+
+
+class FakeClient(object):
+
+    def __init__(self):
+        self.fail = False
+        self.writes = []
+        self.written = threading.Event()
+        self.on_write = None
+
+    def query(self, query, method='GET'):
+        pass
+
+    def write_points(self, points, time_precision, batch_size=None):
+        if self.on_write:
+            self.on_write()
+        if self.fail:
+            raise IOError('InfluxDB is down')
+        self.writes.append(list(points))
+        self.written.set()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient()
+    monkeypatch.setattr(database, 'my_client', fake)
+    return fake
+
+
+@pytest.fixture
+def make_db(client):
+    dbs = []
+
+    def make(**kwargs):
+        kwargs.setdefault('flush_interval', 3600)
+        db = database.Database(**kwargs)
+        dbs.append(db)
+        return db
+
+    yield make
+    client.fail = False
+    for db in dbs:
+        db.close()
+
+
+def test_overflow_drops_oldest_points(make_db):
+    db = make_db(batch_size=100, max_buffered=4)
+
+    db.write([1, 2, 3])
+    db.write([4, 5, 6])
+
+    assert list(db._buffer) == [3, 4, 5, 6]
+    assert db.dropped == 2
+
+
+def test_failed_write_is_put_back_ahead_of_newer_points(make_db, client):
+    db = make_db(batch_size=100)
+    db.write([1, 2])
+    client.fail = True
+    # A reading arrives while the failing request is in flight
+    client.on_write = lambda: db.write([3])
+
+    db.flush()
+
+    assert list(db._buffer) == [1, 2, 3]
+    assert db.dropped == 0
+
+
+def test_no_write_per_point_after_failure(make_db, client):
+    db = make_db(batch_size=2)
+    client.fail = True
+    db._buffer.extend([1, 2])
+    db.flush()
+
+    db.write([3])
+    db.write([4])
+
+    # Retries wait for the flush interval instead of being triggered by every new point
+    assert not db._flush_needed.is_set()
+
+
+def test_full_batch_wakes_flusher(make_db, client):
+    db = make_db(batch_size=2)
+
+    db.write([1, 2])
+
+    assert client.written.wait(1)
+    assert client.writes == [[1, 2]]
+
+
+def test_close_flushes_remaining_points(make_db, client):
+    db = make_db(batch_size=100)
+    db.write([1, 2, 3])
+
+    db.close()
+
+    assert client.writes == [[1, 2, 3]]
+    assert not db._buffer
+
+
+def test_close_reports_points_stuck_in_a_stalled_write(make_db, client, monkeypatch, caplog):
+    monkeypatch.setattr(database, 'SHUTDOWN_TIMEOUT', 0.1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def stall():
+        started.set()
+        release.wait(5)
+    client.on_write = stall
+    db = make_db(batch_size=2)
+    db.write([1, 2])
+    assert started.wait(1)
+    db.write([3])
+
+    db.close()
+    release.set()
+
+    assert "Shutting down with 3 points not written to InfluxDB" in caplog.text
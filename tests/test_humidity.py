@@ -0,0 +1,31 @@
+from app import humidity
+
+
+def test_next_deadline_keeps_interval():
+    assert humidity._next_deadline(10.0, 2.5, 10.0, 10.1) == 12.5
+
+
+def test_next_deadline_waits_out_sensor_minimum_after_late_read():
+    # The previous read started late, the next one must still be MIN_READ_PERIOD after it
+    assert humidity._next_deadline(10.0, 2.5, 11.0, 11.2) == 11.0 + humidity.MIN_READ_PERIOD
+
+
+def test_next_deadline_does_not_catch_up_after_overrun():
+    assert humidity._next_deadline(10.0, 2.5, 10.0, 20.0) == 20.0
+
+
+def test_next_delay_backs_off_to_cap_and_resets():
+    interval = humidity.MIN_READ_PERIOD
+    delay = interval
+    delays = []
+    for failures in range(1, 7):
+        delay = humidity._next_delay(delay, failures, interval)
+        delays.append(delay)
+    assert delays == [2.5, 5.0, 10.0, 20.0, 30.0, 30.0]
+
+    # A good read resets the failure count and with it the delay
+    assert humidity._next_delay(delay, 0, interval) == interval
+
+
+def test_next_delay_cap_never_below_interval():
+    assert humidity._next_delay(60.0, 3, 60.0) == 60.0